@@ -0,0 +1,40 @@
+"""
+Edge bookkeeping for the paper explorer.
+
+Kept in its own module, working only on the containers passed in, so it
+can optionally be compiled with mypyc (see README). paper_explorer.py
+imports it the same way whether it is compiled or not.
+"""
+
+from typing import Any, Callable, Dict, List, Set
+
+
+def link_neighbors(main_paper: Any, neighbor_ids: List[str], papers_db: Dict[str, Any],
+                   id_to_idx: Dict[str, int], idx_to_id: List[str], edges: Set[int],
+                   adj: List[List[int]], mark_changed: Callable[[Any], None]) -> int:
+    """Add edges between a main paper and its references/citations.
+    
+    Edge keys pack the two paper indices as (min_idx << 32) | max_idx.
+    Returns the number of new edges.
+    """
+    main_idx = id_to_idx[main_paper.paper_id]
+    main_adj = adj[main_idx]
+    
+    # Build all candidate edge keys and keep the new ones
+    candidates: Set[int] = set()
+    for neighbor_id in neighbor_ids:
+        idx = id_to_idx[neighbor_id]
+        candidates.add((main_idx << 32) | idx if main_idx < idx else (idx << 32) | main_idx)
+    new_keys = candidates - edges
+    edges.update(new_keys)
+    
+    for key in new_keys:
+        neighbor_idx = key & 0xFFFFFFFF if key >> 32 == main_idx else key >> 32
+        main_adj.append(neighbor_idx)
+        adj[neighbor_idx].append(main_idx)
+        main_paper.edge_count += 1
+        neighbor_paper = papers_db[idx_to_id[neighbor_idx]]
+        neighbor_paper.edge_count += 1
+        mark_changed(neighbor_paper)
+    
+    return len(new_keys)
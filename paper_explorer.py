@@ -4,21 +4,75 @@ Semantic Scholar Paper Explorer
 A local web application to explore papers, their references, citations, and connections.
 """
 
-import requests
-from flask import Flask, render_template_string, jsonify, request
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set
 from datetime import datetime
-import time
+from typing import Callable, Dict, List, Optional, Set
+
+import orjson
+import requests
+from flask import Flask, Response, jsonify, request, send_from_directory
+from flask_compress import Compress
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _fast import link_neighbors
 
 app = Flask(__name__)
+Compress(app)
 
 # Global state for papers
 papers_db: Dict[str, 'Paper'] = {}
-edges: Set[tuple] = set()  # Set of (paper_id1, paper_id2) tuples
+id_to_idx: Dict[str, int] = {}  # Paper ID -> dense index, assigned on insert
+idx_to_id: List[str] = []       # Dense index -> paper ID
+edges: Set[int] = set()         # Set of edge keys, see edge_key()
+adj: List[List[int]] = []       # Neighbor indices for each paper index
+papers_json_cache: Optional[bytes] = None  # Serialized /api/papers payload
+main_count = 0                  # Number of papers with is_main set
+revision = 0                    # Bumped on every change to the graph
+cleared_revision = 0            # Revision of the last /api/clear
+changed_at: Dict[str, int] = {}  # Paper ID -> revision of its last change, oldest first
+unhydrated_ids: Set[str] = set()  # Neighbors stored without metadata, retried on each add
+# Guards all of the above (and the SQLite store) against concurrent request threads
+db_lock = threading.Lock()
+
+# SQLite file the explored graph is persisted to, so it survives restarts
+DB_PATH = os.environ.get('PAPER_EXPLORER_DB', 'paper_explorer.db')
+# How long Semantic Scholar responses are served from the store before refetching
+RESPONSE_TTL = 7 * 24 * 3600  # seconds
+RESPONSE_CACHE_ROWS = 100_000  # Oldest cached responses are evicted beyond this
+
+SEMANTIC_SCHOLAR_API = "https://api.semanticscholar.org/graph/v1/paper"
+# Only what the page renders; the paper URL is derived from paperId in build_paper()
+NEIGHBOR_FIELDS = "paperId,title,authors,year,publicationDate,citationCount"
+MAIN_FIELDS = f"{NEIGHBOR_FIELDS},references.paperId,citations.paperId"
+BATCH_SIZE = 500  # Maximum number of IDs accepted by the batch endpoint
+
+# Upper bound on simultaneous Semantic Scholar requests when adding several papers
+MAX_CONCURRENT_FETCHES = 8
+
+# Shared HTTP session: keeps connections alive and retries rate-limited/failed calls
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET', 'POST']  # The batch endpoint is a read-only POST
+    )
+))
 
 
-@dataclass
+@dataclass(slots=True)
 class Paper:
     paper_id: str
     title: str
@@ -27,47 +81,84 @@ class Paper:
     publication_date: Optional[str]  # Format: YYYY-MM-DD
     citation_count: int
     url: Optional[str]
-    references: List[str] = field(default_factory=list)  # List of paper IDs
-    citations: List[str] = field(default_factory=list)   # List of paper IDs
+    # Lists of paper IDs, only set for main papers
+    references: Optional[List[str]] = None
+    citations: Optional[List[str]] = None
     edge_count: int = 0
     is_main: bool = False  # Whether this was directly added by user
+    needs_metadata: bool = False  # Built from an ID-only record, see unhydrated_ids
+    # Memoized paper_to_dict() output, reset to None whenever the paper changes
+    _cached_dict: Optional[dict] = field(default=None, repr=False, compare=False)
 
 
 def fetch_paper_from_semantic_scholar(paper_id: str) -> Optional[dict]:
-    """Fetch paper details from Semantic Scholar API."""
-    base_url = "https://api.semanticscholar.org/graph/v1/paper"
-    fields = "paperId,title,authors,year,publicationDate,citationCount,url,references.paperId,references.title,references.authors,references.year,references.publicationDate,references.citationCount,references.url,citations.paperId,citations.title,citations.authors,citations.year,citations.publicationDate,citations.citationCount,citations.url"
+    """Fetch paper details from Semantic Scholar API, or the response cache."""
+    cached = get_cached_responses([paper_id], MAIN_FIELDS)
+    if paper_id in cached:
+        return cached[paper_id]
     
-    url = f"{base_url}/{paper_id}?fields={fields}"
+    url = f"{SEMANTIC_SCHOLAR_API}/{paper_id}?fields={MAIN_FIELDS}"
     
     try:
-        response = requests.get(url, timeout=30)
+        response = http_session.get(url, timeout=30)
         if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 429:
-            # Rate limited, wait and retry
-            time.sleep(1)
-            response = requests.get(url, timeout=30)
-            if response.status_code == 200:
-                return response.json()
+            cache_responses({paper_id: response.content}, MAIN_FIELDS)
+            return orjson.loads(response.content)
         return None
     except requests.RequestException as e:
         print(f"Error fetching paper {paper_id}: {e}")
         return None
 
 
-def add_paper_to_db(paper_data: dict, is_main: bool = False) -> Optional[Paper]:
-    """Add a paper to the database from API response."""
+def fetch_papers_batch(paper_ids: List[str]) -> Dict[str, Optional[dict]]:
+    """Fetch metadata for many papers via the Semantic Scholar batch endpoint.
+    
+    Papers in the response cache are not requested again. Maps each answered ID
+    to its metadata, or None if the API has no metadata for it. IDs in chunks
+    that failed to fetch are left out, so callers can retry them later.
+    """
+    url = f"{SEMANTIC_SCHOLAR_API}/batch?fields={NEIGHBOR_FIELDS}"
+    cached = get_cached_responses(paper_ids, NEIGHBOR_FIELDS)
+    missing = [pid for pid in paper_ids if pid not in cached]
+    fetched = {}
+    
+    for start in range(0, len(missing), BATCH_SIZE):
+        chunk = missing[start:start + BATCH_SIZE]
+        try:
+            response = http_session.post(url, json={'ids': chunk}, timeout=30)
+            if response.status_code == 200:
+                fetched.update(zip(chunk, orjson.loads(response.content)))
+        except requests.RequestException as e:
+            print(f"Error fetching batch of {len(chunk)} papers: {e}")
+    
+    cache_responses({pid: orjson.dumps(p) for pid, p in fetched.items() if p}, NEIGHBOR_FIELDS)
+    return {**fetched, **cached}
+
+
+def fetch_papers_concurrently(paper_ids: List[str]) -> Dict[str, Optional[dict]]:
+    """Fetch several papers from Semantic Scholar in parallel."""
+    if not paper_ids:
+        return {}
+    
+    workers = min(MAX_CONCURRENT_FETCHES, len(paper_ids))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paper_ids, pool.map(fetch_paper_from_semantic_scholar, paper_ids)))
+
+
+def build_paper(paper_data: dict, is_main: bool = False) -> Optional[Paper]:
+    """Build a Paper from API response without touching the database."""
     paper_id = paper_data.get('paperId')
     if not paper_id:
         return None
+    # Interned so papers_db keys and reference/citation lists share one string
+    paper_id = sys.intern(paper_id)
     
     authors = [a.get('name', 'Unknown') for a in paper_data.get('authors', [])]
     
     # Build Semantic Scholar URL
     url = paper_data.get('url') or f"https://www.semanticscholar.org/paper/{paper_id}"
     
-    paper = Paper(
+    return Paper(
         paper_id=paper_id,
         title=paper_data.get('title', 'Unknown Title'),
         authors=authors[:5],  # Limit to first 5 authors
@@ -77,19 +168,90 @@ def add_paper_to_db(paper_data: dict, is_main: bool = False) -> Optional[Paper]:
         url=url,
         is_main=is_main
     )
+
+
+def add_paper_to_db(paper_data: dict, is_main: bool = False) -> Optional[Paper]:
+    """Add a paper to the database from API response."""
+    global main_count
+    paper = build_paper(paper_data, is_main)
+    if not paper:
+        return None
+    paper_id = paper.paper_id
     
     # If paper already exists and is now being added as main, update that flag
     if paper_id in papers_db:
-        if is_main:
-            papers_db[paper_id].is_main = True
-        return papers_db[paper_id]
+        existing = papers_db[paper_id]
+        if is_main and existing.needs_metadata:
+            hydrate_paper(existing, paper)
+        if is_main and not existing.is_main:
+            existing.is_main = True
+            main_count += 1
+            mark_changed(existing)
+        return existing
     
-    papers_db[paper_id] = paper
+    if is_main:
+        main_count += 1
+    register_papers({paper_id: paper})
     return paper
 
 
-def process_main_paper(paper_id: str) -> dict:
-    """Process a main paper: fetch it and all its references/citations."""
+def hydrate_paper(paper: Paper, fetched: Paper):
+    """Fill in the metadata of a paper that was stored from an ID-only record."""
+    paper.title = fetched.title
+    paper.authors = fetched.authors
+    paper.year = fetched.year
+    paper.publication_date = fetched.publication_date
+    paper.citation_count = fetched.citation_count
+    paper.url = fetched.url
+    paper.needs_metadata = False
+    unhydrated_ids.discard(paper.paper_id)
+    mark_changed(paper)
+
+
+def register_papers(new_papers: Dict[str, Paper]):
+    """Insert papers missing from papers_db in bulk and assign their dense indices."""
+    start = len(idx_to_id)
+    papers_db.update(new_papers)
+    idx_to_id.extend(new_papers)
+    id_to_idx.update(zip(new_papers, range(start, len(idx_to_id))))
+    adj.extend([] for _ in new_papers)
+    for paper in new_papers.values():
+        mark_changed(paper)
+
+
+def mark_changed(paper: Paper):
+    """Record a change to a paper for cached responses and /api/papers/delta."""
+    global revision
+    revision += 1
+    paper._cached_dict = None
+    # Re-insert so changed_at stays ordered by revision
+    changed_at.pop(paper.paper_id, None)
+    changed_at[paper.paper_id] = revision
+    invalidate_papers_cache()
+
+
+def invalidate_papers_cache():
+    """Drop the serialized /api/papers payload after papers or edges change."""
+    global papers_json_cache
+    papers_json_cache = None
+
+
+def edge_key(idx1: int, idx2: int) -> int:
+    """Pack an undirected edge between two paper indices into a single int."""
+    return (idx1 << 32) | idx2 if idx1 < idx2 else (idx2 << 32) | idx1
+
+
+def process_main_papers(paper_ids: List[str]) -> List[dict]:
+    """Process several main papers, fetching the ones not added yet in parallel."""
+    with db_lock:
+        to_fetch = [pid for pid in dict.fromkeys(paper_ids)
+                    if not (pid in papers_db and papers_db[pid].is_main)]
+    fetched = fetch_papers_concurrently(to_fetch)
+    return [process_main_paper(pid, fetched.get(pid)) for pid in paper_ids]
+
+
+def process_main_paper(paper_id: str, paper_data: Optional[dict]) -> dict:
+    """Process a fetched main paper: add it and all its references/citations."""
     result = {
         'success': False,
         'message': '',
@@ -99,852 +261,474 @@ def process_main_paper(paper_id: str) -> dict:
     }
     
     # Check if already processed as main
-    if paper_id in papers_db and papers_db[paper_id].is_main:
-        result['message'] = 'Paper already added'
-        result['paper'] = paper_to_dict(papers_db[paper_id])
-        return result
+    with db_lock:
+        if paper_id in papers_db and papers_db[paper_id].is_main:
+            result['message'] = 'Paper already added'
+            result['paper'] = paper_to_dict(papers_db[paper_id])
+            return result
     
-    # Fetch paper data
-    paper_data = fetch_paper_from_semantic_scholar(paper_id)
     if not paper_data:
         result['message'] = 'Failed to fetch paper from Semantic Scholar'
         return result
     
-    # Add main paper
-    main_paper = add_paper_to_db(paper_data, is_main=True)
-    if not main_paper:
+    if not paper_data.get('paperId'):
         result['message'] = 'Failed to process paper data'
         return result
     
-    new_papers = 0
-    new_edges = 0
-    
-    # Process references
     references = paper_data.get('references', []) or []
-    for ref in references:
-        ref_id = ref.get('paperId')
-        if ref_id:
-            main_paper.references.append(ref_id)
-            
-            # Add reference paper to DB if not exists
-            if ref_id not in papers_db:
-                add_paper_to_db(ref, is_main=False)
-                new_papers += 1
-            
-            # Add edge
-            edge = tuple(sorted([paper_id, ref_id]))
-            if edge not in edges:
-                edges.add(edge)
-                new_edges += 1
-                papers_db[paper_id].edge_count += 1
-                papers_db[ref_id].edge_count += 1
-    
-    # Process citations
     citations = paper_data.get('citations', []) or []
-    for cite in citations:
-        cite_id = cite.get('paperId')
-        if cite_id:
-            main_paper.citations.append(cite_id)
-            
-            # Add citing paper to DB if not exists
-            if cite_id not in papers_db:
-                add_paper_to_db(cite, is_main=False)
-                new_papers += 1
-            
-            # Add edge
-            edge = tuple(sorted([paper_id, cite_id]))
-            if edge not in edges:
-                edges.add(edge)
-                new_edges += 1
-                papers_db[paper_id].edge_count += 1
-                papers_db[cite_id].edge_count += 1
+    reference_ids = [sys.intern(n['paperId']) for n in references if n.get('paperId')]
+    citation_ids = [sys.intern(n['paperId']) for n in citations if n.get('paperId')]
+    neighbor_ids = reference_ids + citation_ids
+    
+    # Fetch metadata for neighbors not in the DB yet, and for earlier neighbors
+    # whose metadata could not be fetched, in one batch outside the lock
+    with db_lock:
+        retry_ids = list(unhydrated_ids)
+    unseen_ids = [pid for pid in dict.fromkeys(neighbor_ids) if pid not in papers_db]
+    fetch_ids = list(dict.fromkeys(unseen_ids + retry_ids))
+    metadata = fetch_papers_batch(fetch_ids)
+    
+    with db_lock:
+        # Another request may have added the paper while this one was fetching
+        existing = papers_db.get(paper_data['paperId'])
+        if existing and existing.is_main:
+            result['message'] = 'Paper already added'
+            result['paper'] = paper_to_dict(existing)
+            return result
+        
+        # Add main paper
+        main_paper = add_paper_to_db(paper_data, is_main=True)
+        
+        # Fill in neighbors that were stored without metadata earlier. The ones
+        # the API answered without metadata are not retried again.
+        retried_ids = []
+        for pid in retry_ids:
+            paper = papers_db.get(pid)
+            if paper and paper.needs_metadata and pid in metadata:
+                if metadata[pid]:
+                    hydrate_paper(paper, build_paper(metadata[pid]))
+                else:
+                    paper.needs_metadata = False
+                    unhydrated_ids.discard(pid)
+                retried_ids.append(pid)
+        
+        # Build the unseen neighbors first, then insert them into the DB in one pass.
+        # Neighbors whose batch failed (or skipped because a concurrent /api/clear
+        # removed them after the fetch) are kept as ID-only records and retried on
+        # the next add.
+        shallow = {n.get('paperId'): n for n in references + citations}
+        unseen_ids = [pid for pid in dict.fromkeys(neighbor_ids) if pid not in papers_db]
+        new_neighbors = {}
+        for pid in unseen_ids:
+            if metadata.get(pid):
+                new_neighbors[pid] = build_paper(metadata[pid])
+            else:
+                new_neighbors[pid] = build_paper(shallow[pid])
+                if pid not in metadata:
+                    new_neighbors[pid].needs_metadata = True
+                    unhydrated_ids.add(pid)
+        register_papers(new_neighbors)
+        
+        main_paper.references = reference_ids
+        main_paper.citations = citation_ids
+        new_edges = link_neighbors(main_paper, neighbor_ids, papers_db, id_to_idx, idx_to_id,
+                                   edges, adj, mark_changed)
+        
+        mark_changed(main_paper)
+        save_main_paper(main_paper, neighbor_ids + retried_ids)
+        
+        result['paper'] = paper_to_dict(main_paper)
     
     result['success'] = True
     result['message'] = f'Added paper with {len(references)} references and {len(citations)} citations'
-    result['paper'] = paper_to_dict(main_paper)
-    result['new_papers'] = new_papers
+    result['new_papers'] = len(new_neighbors)
     result['new_edges'] = new_edges
     
     return result
 
 
-def paper_to_dict(paper: Paper) -> dict:
-    """Convert Paper object to dictionary for JSON response."""
-    return {
-        'paper_id': paper.paper_id,
-        'title': paper.title,
-        'authors': paper.authors,
-        'year': paper.year,
-        'publication_date': paper.publication_date,
-        'citation_count': paper.citation_count,
-        'url': paper.url,
-        'edge_count': paper.edge_count,
-        'is_main': paper.is_main,
-        'reference_count': len(paper.references),
-        'citing_count': len(paper.citations)
-    }
-
-
-# HTML Template
-HTML_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Semantic Scholar Explorer</title>
-    <link href="https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;500;600&family=Outfit:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        :root {
-            --bg-primary: #0a0a0f;
-            --bg-secondary: #12121a;
-            --bg-tertiary: #1a1a25;
-            --bg-card: #15151f;
-            --accent-primary: #6366f1;
-            --accent-secondary: #818cf8;
-            --accent-glow: rgba(99, 102, 241, 0.3);
-            --text-primary: #f1f5f9;
-            --text-secondary: #94a3b8;
-            --text-muted: #64748b;
-            --border-color: #2a2a3a;
-            --success: #22c55e;
-            --warning: #f59e0b;
-            --danger: #ef4444;
-        }
-
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Outfit', sans-serif;
-            background: var(--bg-primary);
-            color: var(--text-primary);
-            min-height: 100vh;
-            line-height: 1.6;
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-
-        header {
-            text-align: center;
-            margin-bottom: 3rem;
-            padding: 2rem 0;
-            border-bottom: 1px solid var(--border-color);
-        }
-
-        h1 {
-            font-size: 2.5rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: 0.5rem;
-        }
-
-        .subtitle {
-            color: var(--text-secondary);
-            font-size: 1.1rem;
-            font-weight: 300;
-        }
-
-        .input-section {
-            background: var(--bg-card);
-            border: 1px solid var(--border-color);
-            border-radius: 16px;
-            padding: 2rem;
-            margin-bottom: 2rem;
-        }
-
-        .input-group {
-            display: flex;
-            gap: 1rem;
-            align-items: stretch;
-        }
-
-        input[type="text"] {
-            flex: 1;
-            padding: 1rem 1.5rem;
-            font-size: 1rem;
-            font-family: 'JetBrains Mono', monospace;
-            background: var(--bg-secondary);
-            border: 2px solid var(--border-color);
-            border-radius: 12px;
-            color: var(--text-primary);
-            transition: all 0.3s ease;
-        }
-
-        input[type="text"]:focus {
-            outline: none;
-            border-color: var(--accent-primary);
-            box-shadow: 0 0 0 4px var(--accent-glow);
-        }
-
-        input[type="text"]::placeholder {
-            color: var(--text-muted);
-        }
-
-        .btn {
-            padding: 1rem 2rem;
-            font-size: 1rem;
-            font-family: 'Outfit', sans-serif;
-            font-weight: 600;
-            border: none;
-            border-radius: 12px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .btn-primary {
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-            color: white;
-        }
-
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 24px var(--accent-glow);
-        }
-
-        .btn-primary:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none;
-        }
-
-        .btn-secondary {
-            background: var(--bg-tertiary);
-            color: var(--text-primary);
-            border: 1px solid var(--border-color);
-        }
-
-        .btn-secondary:hover {
-            background: var(--bg-secondary);
-            border-color: var(--accent-primary);
-        }
-
-        .stats-bar {
-            display: flex;
-            gap: 2rem;
-            margin-bottom: 2rem;
-            padding: 1.5rem;
-            background: var(--bg-card);
-            border: 1px solid var(--border-color);
-            border-radius: 12px;
-        }
-
-        .stat {
-            text-align: center;
-        }
-
-        .stat-value {
-            font-size: 2rem;
-            font-weight: 700;
-            color: var(--accent-secondary);
-            font-family: 'JetBrains Mono', monospace;
-        }
-
-        .stat-label {
-            font-size: 0.85rem;
-            color: var(--text-muted);
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }
-
-        .controls {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1.5rem;
-            flex-wrap: wrap;
-            gap: 1rem;
-        }
-
-        .sort-controls {
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-        }
-
-        .sort-controls label {
-            color: var(--text-secondary);
-            font-size: 0.9rem;
-        }
-
-        select {
-            padding: 0.75rem 1.25rem;
-            font-size: 0.95rem;
-            font-family: 'Outfit', sans-serif;
-            background: var(--bg-secondary);
-            border: 1px solid var(--border-color);
-            border-radius: 8px;
-            color: var(--text-primary);
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        select:focus {
-            outline: none;
-            border-color: var(--accent-primary);
-        }
-
-        .filter-toggle {
-            display: flex;
-            gap: 0.5rem;
-        }
-
-        .filter-btn {
-            padding: 0.5rem 1rem;
-            font-size: 0.85rem;
-            border-radius: 20px;
-            border: 1px solid var(--border-color);
-            background: transparent;
-            color: var(--text-secondary);
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .filter-btn.active {
-            background: var(--accent-primary);
-            color: white;
-            border-color: var(--accent-primary);
-        }
-
-        .paper-list {
-            display: flex;
-            flex-direction: column;
-            gap: 1rem;
-        }
-
-        .paper-card {
-            background: var(--bg-card);
-            border: 1px solid var(--border-color);
-            border-radius: 12px;
-            padding: 1.5rem;
-            transition: all 0.3s ease;
-        }
-
-        .paper-card:hover {
-            border-color: var(--accent-primary);
-            transform: translateX(4px);
-        }
-
-        .paper-card.main-paper {
-            border-left: 4px solid var(--accent-primary);
-            background: linear-gradient(135deg, var(--bg-card), rgba(99, 102, 241, 0.05));
-        }
-
-        .paper-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            gap: 1rem;
-            margin-bottom: 0.75rem;
-        }
-
-        .paper-title {
-            font-size: 1.1rem;
-            font-weight: 600;
-            color: var(--text-primary);
-            flex: 1;
-            text-decoration: none;
-            transition: color 0.2s ease;
-        }
-
-        .paper-title:hover {
-            color: var(--accent-secondary);
-        }
-
-        .paper-badges {
-            display: flex;
-            gap: 0.5rem;
-            flex-shrink: 0;
-        }
-
-        .badge {
-            padding: 0.25rem 0.75rem;
-            font-size: 0.75rem;
-            font-weight: 600;
-            border-radius: 20px;
-            font-family: 'JetBrains Mono', monospace;
-        }
-
-        .badge-main {
-            background: var(--accent-primary);
-            color: white;
-        }
-
-        .badge-edges {
-            background: rgba(34, 197, 94, 0.2);
-            color: var(--success);
-            border: 1px solid var(--success);
-        }
-
-        .paper-authors {
-            font-size: 0.9rem;
-            color: var(--text-secondary);
-            margin-bottom: 0.5rem;
-        }
-
-        .paper-meta {
-            display: flex;
-            gap: 2rem;
-            font-size: 0.85rem;
-            color: var(--text-muted);
-        }
-
-        .paper-meta span {
-            display: flex;
-            align-items: center;
-            gap: 0.35rem;
-        }
-
-        .paper-id {
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.75rem;
-            color: var(--text-muted);
-            margin-top: 0.75rem;
-            padding-top: 0.75rem;
-            border-top: 1px solid var(--border-color);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 0.5rem;
-        }
-
-        .paper-link {
-            color: var(--accent-secondary);
-            text-decoration: none;
-            font-family: 'Outfit', sans-serif;
-            font-size: 0.8rem;
-            transition: color 0.2s ease;
-        }
-
-        .paper-link:hover {
-            color: var(--accent-primary);
-            text-decoration: underline;
-        }
+def open_store(path: str) -> sqlite3.Connection:
+    """Open the SQLite store, creating its tables if needed."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS papers (
+            paper_id TEXT PRIMARY KEY,
+            title TEXT,
+            authors TEXT,           -- JSON list of names
+            year INTEGER,
+            publication_date TEXT,
+            citation_count INTEGER,
+            url TEXT,
+            reference_ids TEXT,     -- JSON list of paper IDs
+            citation_ids TEXT,      -- JSON list of paper IDs
+            edge_count INTEGER,
+            is_main INTEGER,
+            needs_metadata INTEGER  -- Stored from an ID-only record
+        );
+        CREATE TABLE IF NOT EXISTS edges (
+            a TEXT,
+            b TEXT,
+            PRIMARY KEY (a, b)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS responses (
+            paper_id TEXT,
+            fields TEXT,            -- Requested fields, so changing them misses the cache
+            fetched_at REAL,
+            body BLOB,              -- Raw JSON from Semantic Scholar
+            PRIMARY KEY (paper_id, fields)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,   -- 'revision' and 'cleared_revision'
+            value INTEGER
+        );
+    ''')
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(papers)')}
+    if 'needs_metadata' not in columns:  # Stores created before the column existed
+        conn.execute('ALTER TABLE papers ADD COLUMN needs_metadata INTEGER DEFAULT 0')
+    return conn
+
+
+store = open_store(DB_PATH)
+
+
+def get_cached_responses(paper_ids: List[str], fields: str) -> Dict[str, dict]:
+    """Look up unexpired Semantic Scholar responses for the given papers."""
+    cutoff = time.time() - RESPONSE_TTL
+    cached = {}
+    with db_lock:
+        # Chunked to stay below SQLite's limit on query parameters
+        for start in range(0, len(paper_ids), BATCH_SIZE):
+            chunk = paper_ids[start:start + BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = store.execute(
+                f'SELECT paper_id, body FROM responses '
+                f'WHERE fields = ? AND fetched_at >= ? AND paper_id IN ({placeholders})',
+                [fields, cutoff] + chunk
+            )
+            cached.update((pid, orjson.loads(body)) for pid, body in rows)
+    return cached
+
+
+def cache_responses(bodies: Dict[str, bytes], fields: str):
+    """Store raw Semantic Scholar responses keyed by paper ID and requested fields.
+    
+    Expired responses are dropped, and the oldest ones beyond
+    RESPONSE_CACHE_ROWS are evicted.
+    """
+    if not bodies:
+        return
+    now = time.time()
+    with db_lock, store:
+        store.executemany('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                          [(pid, fields, now, body) for pid, body in bodies.items()])
+        store.execute('DELETE FROM responses WHERE fetched_at < ?', (now - RESPONSE_TTL,))
+        excess = store.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - RESPONSE_CACHE_ROWS
+        if excess > 0:
+            store.execute('''
+                DELETE FROM responses WHERE (paper_id, fields) IN (
+                    SELECT paper_id, fields FROM responses ORDER BY fetched_at LIMIT ?
+                )
+            ''', (excess,))
+
+
+def save_main_paper(main_paper: Paper, neighbor_ids: List[str]):
+    """Write a processed main paper, its neighbors and their edges to the store.
+    
+    neighbor_ids may also hold other papers whose rows changed, edges are
+    only written for the main paper's actual references/citations.
+    """
+    rows = []
+    for pid in dict.fromkeys([main_paper.paper_id] + neighbor_ids):
+        p = papers_db[pid]
+        rows.append((p.paper_id, p.title, json.dumps(p.authors), p.year, p.publication_date,
+                     p.citation_count, p.url, json.dumps(p.references), json.dumps(p.citations),
+                     p.edge_count, int(p.is_main), int(p.needs_metadata)))
+    main_id = main_paper.paper_id
+    linked_ids = (main_paper.references or []) + (main_paper.citations or [])
+    edge_rows = [(main_id, pid) if main_id < pid else (pid, main_id) for pid in linked_ids]
+    
+    with store:
+        # Upsert rather than replace so rows keep their insertion order
+        store.executemany('''
+            INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(paper_id) DO UPDATE SET
+                title = excluded.title,
+                authors = excluded.authors,
+                year = excluded.year,
+                publication_date = excluded.publication_date,
+                citation_count = excluded.citation_count,
+                url = excluded.url,
+                needs_metadata = excluded.needs_metadata,
+                reference_ids = excluded.reference_ids,
+                citation_ids = excluded.citation_ids,
+                edge_count = excluded.edge_count,
+                is_main = excluded.is_main
+        ''', rows)
+        store.executemany('INSERT OR IGNORE INTO edges VALUES (?, ?)', edge_rows)
+        save_revision()
+
+
+def save_revision():
+    """Persist the revision counters, so ETags and delta cursors survive restarts."""
+    store.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                      [('revision', revision), ('cleared_revision', cleared_revision)])
+
+
+def load_store():
+    """Rebuild the in-memory graph from the store."""
+    global main_count, revision, cleared_revision
+    loaded = {}
+    for row in store.execute('SELECT * FROM papers ORDER BY rowid'):
+        (paper_id, title, authors, year, publication_date, citation_count, url,
+         reference_ids, citation_ids, edge_count, is_main, needs_metadata) = row
+        paper_id = sys.intern(paper_id)
+        references, citations = json.loads(reference_ids), json.loads(citation_ids)
+        loaded[paper_id] = Paper(
+            paper_id=paper_id,
+            title=title,
+            authors=json.loads(authors),
+            year=year,
+            publication_date=publication_date,
+            citation_count=citation_count,
+            url=url,
+            references=[sys.intern(pid) for pid in references] if references is not None else None,
+            citations=[sys.intern(pid) for pid in citations] if citations is not None else None,
+            edge_count=edge_count,
+            is_main=bool(is_main),
+            needs_metadata=bool(needs_metadata)
+        )
+        main_count += bool(is_main)
+        if needs_metadata:
+            unhydrated_ids.add(paper_id)
+    register_papers(loaded)
+    
+    for a, b in store.execute('SELECT a, b FROM edges'):
+        idx_a, idx_b = id_to_idx[a], id_to_idx[b]
+        edges.add(edge_key(idx_a, idx_b))
+        adj[idx_a].append(idx_b)
+        adj[idx_b].append(idx_a)
+    
+    # Continue from the stored revision. Loaded papers count as changed at that
+    # revision: clients that were up to date see no delta, older ones get them all.
+    counters = dict(store.execute('SELECT key, value FROM meta'))
+    revision = max(revision, counters.get('revision', 0))
+    cleared_revision = counters.get('cleared_revision', 0)
+    for paper_id in changed_at:
+        changed_at[paper_id] = revision
 
-        .loading {
-            display: none;
-            align-items: center;
-            justify-content: center;
-            padding: 2rem;
-            color: var(--text-secondary);
-        }
 
-        .loading.active {
-            display: flex;
-        }
+# Loaded at import, so every entry point (flask run, WSGI servers) writes to a populated graph
+load_store()
 
-        .spinner {
-            width: 24px;
-            height: 24px;
-            border: 3px solid var(--border-color);
-            border-top-color: var(--accent-primary);
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            margin-right: 1rem;
-        }
 
-        @keyframes spin {
-            to { transform: rotate(360deg); }
-        }
+def paper_to_dict(paper: Paper) -> dict:
+    """Convert Paper object to dictionary for JSON response."""
+    if paper._cached_dict is None:
+        paper._cached_dict = {
+            'paper_id': paper.paper_id,
+            'title': paper.title,
+            'authors': paper.authors,
+            'year': paper.year,
+            'publication_date': paper.publication_date,
+            'citation_count': paper.citation_count,
+            'url': paper.url,
+            'edge_count': paper.edge_count,
+            'is_main': paper.is_main,
+            'reference_count': len(paper.references or ()),
+            'citing_count': len(paper.citations or ())
+        }
+    return paper._cached_dict
 
-        .message {
-            padding: 1rem 1.5rem;
-            border-radius: 8px;
-            margin-bottom: 1rem;
-            font-size: 0.95rem;
-            display: none;
-        }
 
-        .message.success {
-            display: block;
-            background: rgba(34, 197, 94, 0.1);
-            border: 1px solid var(--success);
-            color: var(--success);
-        }
+@app.route('/')
+def index():
+    """Serve the main page."""
+    return send_from_directory(app.static_folder, 'index.html', max_age=3600)
 
-        .message.error {
-            display: block;
-            background: rgba(239, 68, 68, 0.1);
-            border: 1px solid var(--danger);
-            color: var(--danger);
-        }
 
-        .empty-state {
-            text-align: center;
-            padding: 4rem 2rem;
-            color: var(--text-muted);
-        }
+@app.route('/api/add_paper', methods=['POST'])
+def api_add_paper():
+    """API endpoint to add a new paper."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    paper_ids = data.get('paper_ids') or [data.get('paper_id', '')]
+    if isinstance(paper_ids, list) and all(isinstance(pid, str) for pid in paper_ids):
+        paper_ids = [pid.strip() for pid in paper_ids if pid.strip()]
+    else:
+        paper_ids = []
+    
+    if not paper_ids:
+        return jsonify({'success': False, 'message': 'Paper ID is required'})
+    
+    results = process_main_papers(paper_ids)
+    if len(results) == 1:
+        return jsonify(results[0])
+    
+    added = [r for r in results if r['success']]
+    return jsonify({
+        'success': bool(added),
+        'message': f'Added {len(added)} of {len(results)} papers',
+        'new_papers': sum(r['new_papers'] for r in results),
+        'new_edges': sum(r['new_edges'] for r in results),
+        'results': results
+    })
+
+
+def papers_stats() -> dict:
+    """Summary counts shown in the stats bar."""
+    return {
+        'total_papers': len(papers_db),
+        'main_papers': main_count,
+        'total_edges': len(edges)
+    }
 
-        .empty-state svg {
-            width: 64px;
-            height: 64px;
-            margin-bottom: 1rem;
-            opacity: 0.5;
-        }
 
-        .hint {
-            font-size: 0.85rem;
-            color: var(--text-muted);
-            margin-top: 1rem;
-        }
+def revision_response(build_payload: Callable[[], bytes]) -> Response:
+    """JSON response tagged with the current revision, 304 if the client has it.
+    
+    The check happens before build_payload runs, and before flask-compress
+    sees the response. flask-compress tags compressed responses as
+    "rev-N:<algorithm>", so clients send that back and it counts as a match.
+    """
+    etag = f'rev-{revision}'
+    for tag in request.if_none_match.as_set(include_weak=True):
+        if tag == etag or tag.startswith(etag + ':'):
+            response = Response(status=304)
+            response.set_etag(tag)
+            response.cache_control.no_cache = True
+            return response
+    
+    response = Response(build_payload(), mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
 
-        .hint code {
-            background: var(--bg-tertiary);
-            padding: 0.2rem 0.5rem;
-            border-radius: 4px;
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.8rem;
-        }
 
-        @media (max-width: 768px) {
-            .container {
-                padding: 1rem;
-            }
-
-            .input-group {
-                flex-direction: column;
-            }
-
-            .stats-bar {
-                flex-wrap: wrap;
-                gap: 1rem;
-            }
-
-            .stat {
-                flex: 1;
-                min-width: 100px;
-            }
-
-            .controls {
-                flex-direction: column;
-                align-items: stretch;
-            }
-
-            .sort-controls {
-                flex-wrap: wrap;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>Semantic Scholar Explorer</h1>
-            <p class="subtitle">Discover paper connections through references and citations</p>
-        </header>
-
-        <div class="input-section">
-            <div class="input-group">
-                <input type="text" id="paperInput" placeholder="Enter Semantic Scholar Paper ID (e.g., 204e3073870fae3d05bcbc2f6a8e263d9b72e776)">
-                <button class="btn btn-primary" id="addBtn" onclick="addPaper()">
-                    <svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                        <line x1="12" y1="5" x2="12" y2="19"></line>
-                        <line x1="5" y1="12" x2="19" y2="12"></line>
-                    </svg>
-                    Add Paper
-                </button>
-            </div>
-            <p class="hint">Find paper IDs on <a href="https://www.semanticscholar.org" target="_blank" style="color: var(--accent-secondary);">semanticscholar.org</a> — the ID is in the URL after <code>/paper/</code></p>
-        </div>
-
-        <div id="message" class="message"></div>
-
-        <div class="stats-bar">
-            <div class="stat">
-                <div class="stat-value" id="totalPapers">0</div>
-                <div class="stat-label">Total Papers</div>
-            </div>
-            <div class="stat">
-                <div class="stat-value" id="mainPapers">0</div>
-                <div class="stat-label">Added Papers</div>
-            </div>
-            <div class="stat">
-                <div class="stat-value" id="totalEdges">0</div>
-                <div class="stat-label">Total Edges</div>
-            </div>
-        </div>
-
-        <div class="controls">
-            <div class="sort-controls">
-                <label>Primary Sort:</label>
-                <select id="primarySort" onchange="updatePaperList()">
-                    <option value="edges">Edges (connections)</option>
-                    <option value="citations">Citations</option>
-                    <option value="year">Year</option>
-                </select>
-                
-                <label>Secondary Sort:</label>
-                <select id="secondarySort" onchange="updatePaperList()">
-                    <option value="citations">Citations</option>
-                    <option value="edges">Edges (connections)</option>
-                    <option value="year">Year</option>
-                </select>
-            </div>
-            
-            <div class="filter-toggle">
-                <button class="filter-btn active" data-filter="all" onclick="setFilter('all')">All Papers</button>
-                <button class="filter-btn" data-filter="main" onclick="setFilter('main')">Added Only</button>
-            </div>
-        </div>
-
-        <div class="loading" id="loading">
-            <div class="spinner"></div>
-            <span>Fetching paper data...</span>
-        </div>
-
-        <div class="paper-list" id="paperList">
-            <div class="empty-state">
-                <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1.5">
-                    <path d="M9 12h6m-6 4h6m2 5H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z"/>
-                </svg>
-                <p>No papers added yet</p>
-                <p style="font-size: 0.9rem; margin-top: 0.5rem;">Add a paper ID above to get started</p>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let papers = [];
-        let currentFilter = 'all';
-
-        async function addPaper() {
-            const input = document.getElementById('paperInput');
-            const paperId = input.value.trim();
-            
-            if (!paperId) {
-                showMessage('Please enter a paper ID', 'error');
-                return;
-            }
+def parse_limit() -> Optional[int]:
+    """Positive ?limit= value (200 if absent), None if it is invalid."""
+    limit = request.args.get('limit', '200')
+    return int(limit) if limit.isdecimal() and int(limit) > 0 else None
 
-            const addBtn = document.getElementById('addBtn');
-            const loading = document.getElementById('loading');
-            
-            addBtn.disabled = true;
-            loading.classList.add('active');
-            hideMessage();
-
-            try {
-                const response = await fetch('/api/add_paper', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ paper_id: paperId })
-                });
-
-                const data = await response.json();
-
-                if (data.success) {
-                    showMessage(`${data.message} • ${data.new_papers} new papers, ${data.new_edges} new edges`, 'success');
-                    input.value = '';
-                    await fetchPapers();
-                } else {
-                    showMessage(data.message || 'Failed to add paper', 'error');
-                }
-            } catch (error) {
-                showMessage('Network error: ' + error.message, 'error');
-            } finally {
-                addBtn.disabled = false;
-                loading.classList.remove('active');
-            }
-        }
 
-        async function fetchPapers() {
-            try {
-                const response = await fetch('/api/papers');
-                const data = await response.json();
-                papers = data.papers;
-                updateStats(data.stats);
-                updatePaperList();
-            } catch (error) {
-                console.error('Error fetching papers:', error);
-            }
-        }
+# Sort fields accepted by /api/papers?sort=, all sorted descending
+SORT_KEYS = {
+    'edges': lambda p: p.edge_count,
+    'citations': lambda p: p.citation_count or 0,
+    'year': lambda p: p.year if p.year is not None else float('-inf'),  # Null years last
+}
 
-        function updateStats(stats) {
-            document.getElementById('totalPapers').textContent = stats.total_papers;
-            document.getElementById('mainPapers').textContent = stats.main_papers;
-            document.getElementById('totalEdges').textContent = stats.total_edges;
-        }
 
-        function updatePaperList() {
-            const primarySort = document.getElementById('primarySort').value;
-            const secondarySort = document.getElementById('secondarySort').value;
+@app.route('/api/papers', methods=['GET'])
+def api_get_papers():
+    """API endpoint to get all papers.
+    
+    ?sort=primary,secondary&limit=&filter=main returns the top papers by
+    those fields, ?after=&limit= returns one page in insertion order.
+    """
+    if 'sort' in request.args:
+        fields = request.args['sort'].split(',')
+        if not all(f in SORT_KEYS for f in fields):
+            return jsonify({'success': False, 'message': f"Unknown sort field in: {request.args['sort']}"})
+        
+        limit = parse_limit()
+        if limit is None:
+            return jsonify({'success': False, 'message': 'limit must be a positive integer'})
+        
+        key_funcs = [SORT_KEYS[f] for f in fields]
+        with db_lock:
+            candidates = papers_db.values()
+            if request.args.get('filter') == 'main':
+                candidates = (p for p in candidates if p.is_main)
             
-            let filteredPapers = currentFilter === 'main' 
-                ? papers.filter(p => p.is_main) 
-                : [...papers];
-
-            // Sort papers
-            filteredPapers.sort((a, b) => {
-                // Primary sort
-                let comparison = compareBy(a, b, primarySort);
-                if (comparison !== 0) return comparison;
-                
-                // Secondary sort
-                return compareBy(a, b, secondarySort);
-            });
-
-            renderPapers(filteredPapers);
-        }
-
-        function compareBy(a, b, field) {
-            switch (field) {
-                case 'edges':
-                    return (b.edge_count || 0) - (a.edge_count || 0);
-                case 'citations':
-                    return (b.citation_count || 0) - (a.citation_count || 0);
-                case 'year':
-                    // Sort by year only (newest first), null years at end
-                    if (a.year === null && b.year === null) return 0;
-                    if (a.year === null) return 1;
-                    if (b.year === null) return -1;
-                    return b.year - a.year;
-                default:
-                    return 0;
-            }
-        }
-
-        function formatDate(publicationDate, year) {
-            if (publicationDate) {
-                // Format: YYYY-MM-DD -> Month Day, Year
-                const date = new Date(publicationDate + 'T00:00:00');
-                const options = { year: 'numeric', month: 'short', day: 'numeric' };
-                return date.toLocaleDateString('en-US', options);
-            } else if (year) {
-                return year.toString();
-            }
-            return 'N/A';
-        }
-
-        function renderPapers(paperList) {
-            const container = document.getElementById('paperList');
+            return revision_response(lambda: orjson.dumps({
+                'papers': [paper_to_dict(p) for p in heapq.nlargest(
+                    limit, candidates, key=lambda p: tuple(k(p) for k in key_funcs))],
+                'stats': papers_stats()
+            }))
+    
+    if 'after' in request.args or 'limit' in request.args:
+        after = request.args.get('after')
+        limit = parse_limit()
+        if limit is None:
+            return jsonify({'success': False, 'message': 'limit must be a positive integer'})
+        
+        with db_lock:
+            if after and after not in id_to_idx:
+                return jsonify({'success': False, 'message': f'Unknown paper ID: {after}'})
             
-            if (paperList.length === 0) {
-                container.innerHTML = `
-                    <div class="empty-state">
-                        <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1.5">
-                            <path d="M9 12h6m-6 4h6m2 5H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z"/>
-                        </svg>
-                        <p>${currentFilter === 'main' ? 'No added papers yet' : 'No papers added yet'}</p>
-                        <p style="font-size: 0.9rem; margin-top: 0.5rem;">Add a paper ID above to get started</p>
-                    </div>
-                `;
-                return;
-            }
-
-            container.innerHTML = paperList.map(paper => `
-                <div class="paper-card ${paper.is_main ? 'main-paper' : ''}">
-                    <div class="paper-header">
-                        <a href="${paper.url}" target="_blank" class="paper-title">${escapeHtml(paper.title)}</a>
-                        <div class="paper-badges">
-                            ${paper.is_main ? '<span class="badge badge-main">ADDED</span>' : ''}
-                            ${paper.edge_count > 0 ? `<span class="badge badge-edges">${paper.edge_count} edges</span>` : ''}
-                        </div>
-                    </div>
-                    <div class="paper-authors">${escapeHtml(paper.authors.join(', '))}</div>
-                    <div class="paper-meta">
-                        <span>📅 ${formatDate(paper.publication_date, paper.year)}</span>
-                        <span>📚 ${paper.citation_count.toLocaleString()} citations</span>
-                        ${paper.is_main ? `<span>📖 ${paper.reference_count} refs</span>` : ''}
-                        ${paper.is_main ? `<span>🔗 ${paper.citing_count} citing</span>` : ''}
-                    </div>
-                    <div class="paper-id">
-                        <span>ID: ${paper.paper_id}</span>
-                        <a href="${paper.url}" target="_blank" class="paper-link">View on Semantic Scholar →</a>
-                    </div>
-                </div>
-            `).join('');
-        }
-
-        function setFilter(filter) {
-            currentFilter = filter;
-            document.querySelectorAll('.filter-btn').forEach(btn => {
-                btn.classList.toggle('active', btn.dataset.filter === filter);
-            });
-            updatePaperList();
-        }
-
-        function showMessage(text, type) {
-            const msg = document.getElementById('message');
-            msg.textContent = text;
-            msg.className = 'message ' + type;
-        }
-
-        function hideMessage() {
-            document.getElementById('message').className = 'message';
-        }
-
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-
-        // Handle Enter key
-        document.getElementById('paperInput').addEventListener('keypress', (e) => {
-            if (e.key === 'Enter') addPaper();
-        });
-
-        // Initial fetch
-        fetchPapers();
-    </script>
-</body>
-</html>
-'''
-
-
-@app.route('/')
-def index():
-    """Serve the main page."""
-    return render_template_string(HTML_TEMPLATE)
-
-
-@app.route('/api/add_paper', methods=['POST'])
-def api_add_paper():
-    """API endpoint to add a new paper."""
-    data = request.get_json()
-    paper_id = data.get('paper_id', '').strip()
+            start = id_to_idx[after] + 1 if after else 0
+            page_ids = idx_to_id[start:start + limit]
+            has_more = start + limit < len(idx_to_id)
+            return revision_response(lambda: orjson.dumps({
+                'papers': [paper_to_dict(papers_db[pid]) for pid in page_ids],
+                'stats': papers_stats(),
+                'next': page_ids[-1] if page_ids and has_more else None
+            }))
     
-    if not paper_id:
-        return jsonify({'success': False, 'message': 'Paper ID is required'})
+    def build_payload() -> bytes:
+        global papers_json_cache
+        if papers_json_cache is None:
+            papers_list = [paper_to_dict(p) for p in papers_db.values()]
+            papers_json_cache = orjson.dumps({'papers': papers_list, 'stats': papers_stats()})
+        return papers_json_cache
     
-    result = process_main_paper(paper_id)
-    return jsonify(result)
+    with db_lock:
+        return revision_response(build_payload)
 
 
-@app.route('/api/papers', methods=['GET'])
-def api_get_papers():
-    """API endpoint to get all papers."""
-    papers_list = [paper_to_dict(p) for p in papers_db.values()]
+@app.route('/api/papers/delta', methods=['GET'])
+def api_get_papers_delta():
+    """API endpoint to get papers changed after revision ?since=.
     
-    stats = {
-        'total_papers': len(papers_db),
-        'main_papers': sum(1 for p in papers_db.values() if p.is_main),
-        'total_edges': len(edges)
-    }
+    reset is true when the data was cleared in between, or since is not a
+    revision of this store, and the client should drop the papers it has.
+    """
+    since = request.args.get('since', 0, type=int)
+    
+    def build_payload() -> bytes:
+        changed = []
+        for paper_id in reversed(changed_at):
+            if changed_at[paper_id] <= since:
+                break
+            changed.append(paper_to_dict(papers_db[paper_id]))
+        changed.reverse()
+        
+        return orjson.dumps({
+            'papers': changed,
+            'stats': papers_stats(),
+            'revision': revision,
+            'reset': since < cleared_revision or since > revision
+        })
     
-    return jsonify({'papers': papers_list, 'stats': stats})
+    with db_lock:
+        return revision_response(build_payload)
 
 
 @app.route('/api/clear', methods=['POST'])
 def api_clear():
     """API endpoint to clear all data."""
-    global papers_db, edges
-    papers_db = {}
-    edges = set()
+    global papers_db, id_to_idx, idx_to_id, edges, adj, main_count
+    global revision, cleared_revision, changed_at, unhydrated_ids
+    with db_lock:
+        papers_db = {}
+        id_to_idx = {}
+        idx_to_id = []
+        edges = set()
+        adj = []
+        main_count = 0
+        revision += 1
+        cleared_revision = revision
+        changed_at = {}
+        unhydrated_ids = set()
+        invalidate_papers_cache()
+        with store:
+            store.execute('DELETE FROM papers')
+            store.execute('DELETE FROM edges')
+            save_revision()
     return jsonify({'success': True, 'message': 'All data cleared'})
 
 